@@ -1,14 +1,43 @@
 '''
 Mastodon public API types
 '''
+import re
 from dataclasses import dataclass
+from functools import cached_property
 from datetime import datetime
 from enum import Enum
-from SlyAPI import *
 from SlyAPI.web import JsonMap
 
 from .serialization import DataclassJsonMixin
 
+# host part of an account URL, like mastodon.example.com
+_HOST_RE = re.compile(r'https?://([^/]+)')
+
+try: # optional C (Lexbor) HTML parser, installed with SlyMastodon[fast]
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+def _strip_tags(html: str) -> str:
+    'Plain text of an HTML fragment using only the stdlib parser'
+    from html.parser import HTMLParser
+    parts: list[str] = []
+    parser = HTMLParser()
+    parser.handle_data = parts.append # type: ignore - bound per instance
+    parser.feed(html)
+    parser.close()
+    return ' '.join(p for p in map(str.strip, parts) if p)
+
+def clean_html(html: str) -> str:
+    '''
+    The plain text of an HTML fragment, such as `Post.content`,
+    with tags removed and entities decoded
+    '''
+    if LexborHTMLParser is not None:
+        body = LexborHTMLParser(html).body
+        return body.text(separator=' ', strip=True) if body else ''
+    return _strip_tags(html)
+
 class Privacy(Enum):
     '''Visibility'''
     PUBLIC = "public"
@@ -31,7 +60,7 @@ class MediaType(Enum):
     AUDIO = "audio"
     UNKNOWN = "unknown"
 
-@dataclass
+@dataclass(slots=True)
 class Emoji:
     '''https://docs.joinmastodon.org/entities/CustomEmoji/'''
     shortcode: str
@@ -40,14 +69,14 @@ class Emoji:
     visible_in_picker: bool
     category: str
 
-@dataclass
+@dataclass(slots=True)
 class UserField(DataclassJsonMixin):
     'https://docs.joinmastodon.org/entities/Account/#Field'
     name: str
     value: str
     verified_at: datetime
 
-@dataclass
+@dataclass(slots=True)
 class User(DataclassJsonMixin):
     '''https://docs.joinmastodon.org/entities/Account/'''
     id: str
@@ -74,11 +103,15 @@ class User(DataclassJsonMixin):
     @property
     def at_username(self) -> str:
         '''Full webfinger address'''
-        domain = self.url.split('/')[2]
-        domain = '.'.join(domain.split('.')[-2:])
-        return f"@{self.username}@{domain}"
+        m = _HOST_RE.match(self.url)
+        if m is None:
+            raise ValueError(F"Unexpected account URL: {self.url}")
+        host = m.group(1)
+        # keep only the last two labels of the host
+        dot = host.rfind('.', 0, host.rfind('.'))
+        return F"@{self.username}@{host[dot+1:]}"
 
-@dataclass
+@dataclass(slots=True)
 class Role:
     'https://docs.joinmastodon.org/entities/Role/'
     id: str
@@ -90,7 +123,7 @@ class Role:
     created_at: str
     updated_at: str
 
-@dataclass
+@dataclass(slots=True)
 class _MediaAttachmentBase(DataclassJsonMixin):
     id: str
     type: MediaType
@@ -111,13 +144,13 @@ class UnuploadedMediaAttachment(_MediaAttachmentBase):
     'Media attachment that has not finished being uploaded yet'
     url: str|None
 
-@dataclass
+@dataclass(slots=True)
 class Application:
     'https://docs.joinmastodon.org/entities/Application/'
     name: str
     website: str|None
 
-@dataclass
+@dataclass(slots=True)
 class StatusMention:
     '''
     Mentions of user within the status content.
@@ -129,7 +162,7 @@ class StatusMention:
     url: str
     acct: str
 
-@dataclass
+@dataclass(slots=True)
 class StatusTag:
     '''
     Hashtag used within the status content.
@@ -139,13 +172,13 @@ class StatusTag:
     name: str
     url: str
 
-@dataclass
+@dataclass(slots=True)
 class PollOption:
     '''https://docs.joinmastodon.org/entities/Poll/#Option'''
     title: str
     votes_count: int
 
-@dataclass
+@dataclass(slots=True)
 class Poll(DataclassJsonMixin):
     'https://docs.joinmastodon.org/entities/Poll/'
     id: str
@@ -164,7 +197,7 @@ class PreviewType(Enum):
     VIDEO = "video"
     RICH = "rich"
 
-@dataclass
+@dataclass(slots=True)
 class PreviewCard(DataclassJsonMixin):
     '''
     Rich preview card that is generated using OpenGraph tags from a URL.
@@ -184,7 +217,7 @@ class PreviewCard(DataclassJsonMixin):
     embed_url: str
     blurhash: str|None
 
-@dataclass
+@dataclass(slots=True)
 class _PostBase(DataclassJsonMixin):
     id: str
     created_at: str
@@ -209,10 +242,17 @@ class _PostBase(DataclassJsonMixin):
     language: str|None
     edited_at: str|None
 
+# no slots=True here: cached_property needs the subclass __dict__
+@dataclass
 class Post(_PostBase):
     '''A post, toot, tweet, or status'''
     content: str
 
+    @cached_property
+    def plain_content(self) -> str:
+        '''`content` with HTML removed; parsed once per post'''
+        return clean_html(self.content)
+
 class DeletedPost(_PostBase):
     '''A deleted post'''
     text: str|None
\ No newline at end of file
@@ -4,21 +4,21 @@ Mastodon API client and authenticated types
 https://docs.joinmastodon.org/api/
 '''
 import asyncio
-from dataclasses import asdict, dataclass
+import functools
+import os
+import stat
+import sys
+from dataclasses import dataclass, fields
 from datetime import datetime
-import re
-from typing import IO, cast, overload
+from io import BytesIO
+from urllib.parse import urlsplit
+from typing import IO, AsyncIterable, AsyncIterator, cast, overload
 from SlyAPI import *
 from SlyAPI.web import Method, ApiError
 from aiohttp import FormData
 
 from .entities import *
-from .public import MastodonPublic
-
-# like @username@domain
-RE_AT_AT = re.compile(r'@(\w+)@(\w+)')
-# like @username
-RE_AT = re.compile(r'@(\w+)')
+from .public import MastodonPublic, _U_STATUSES
 
 class ScopeSimple:
     '''
@@ -63,7 +63,7 @@ class ScopeGranular:
     WRITE_REPORTS = "write:reports"
     WRITE_STATUSES = "write:statuses"
 
-@dataclass
+@dataclass(slots=True)
 class CredentialSource(DataclassJsonMixin):
     '''Extra info provided for the account of an authorized user'''
     sensitive: bool
@@ -95,7 +95,7 @@ class AuthorizedPost(Post):
     pinned: bool
     filtered: bool
     
-@dataclass
+@dataclass(slots=True)
 class PollSetup:
     '''Parameters for creating a poll when posting'''
     options: list[str]
@@ -103,7 +103,7 @@ class PollSetup:
     multiple: bool|None
     hide_totals: bool|None
 
-@dataclass
+@dataclass(slots=True)
 class ScheduledPostParams(DataclassJsonMixin):
     '''https://docs.joinmastodon.org/entities/ScheduledStatus/#params'''
     text: str
@@ -118,7 +118,7 @@ class ScheduledPostParams(DataclassJsonMixin):
     idempotency: str|None
     with_rate_limit: bool
 
-@dataclass
+@dataclass(slots=True)
 class ScheduledPost(DataclassJsonMixin):
     '''
     A scheduled post that has not been posted yet
@@ -130,55 +130,129 @@ class ScheduledPost(DataclassJsonMixin):
     params: ScheduledPostParams
     media_attachments: list[MediaAttachment]
 
-import urllib3
-import os
-import aiofiles
-import aiofiles.os
-import mimetypes
+# hot-path URL prefixes, shared with public.py's account/status prefixes
+_U_MEDIA = "media/"
+
+# read/download granularity for streamed uploads
+_CHUNK_SIZE = 65536
+
+async def _stream_file(path: str) -> AsyncIterator[bytes]:
+    import aiofiles # deferred: only upload paths need it
+    async with aiofiles.open(path, "rb") as f:
+        while chunk := await f.read(_CHUNK_SIZE):
+            yield chunk
 
 def _check_size(size: int|float, max_bytes: int|None=None) -> None:
     if max_bytes and size > max_bytes:
         raise ValueError(F"File too large: {size} > {max_bytes}")
 
+@functools.lru_cache(maxsize=64)
+def _ext_to_mime(ext: str) -> str:
+    import mimetypes # deferred: builds its extension map on import
+    return mimetypes.types_map.get(ext) or "application/octet-stream"
+
 def _mime_type(filename: str) -> str:
-    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    return _ext_to_mime(os.path.splitext(filename)[1].lower())
 
 def _media_ids(media: list[str|MediaAttachment]|None) -> list[str]|None:
     if media is None: return None
-    return [ str(m) for m in media ]
+    ids: list[str] = []
+    for m in media:
+        match m:
+            case str(): ids.append(m)
+            case MediaAttachment(): ids.append(m.id)
+            case _:
+                raise TypeError(F"Expected media ID or MediaAttachment, got {m!r}")
+    return ids
+
+_POLL_FIELDS = tuple(f.name for f in fields(PollSetup))
+
+# wire strings for each visibility, interned so downstream comparisons are
+# pointer checks; avoids the Enum.value descriptor on the posting hot path
+_PRIVACY_STR = {p: sys.intern(p.value) for p in Privacy}
+
+def _poll_data(poll: PollSetup) -> dict[str, object]:
+    return {n: getattr(poll, n) for n in _POLL_FIELDS}
+
+@functools.lru_cache(maxsize=16)
+def _iso(dt: datetime) -> str:
+    return dt.isoformat()
+
+def _status_data(text: str|None, media: list[str|MediaAttachment]|None,
+                 reply_to: str|None, poll: PollSetup|None,
+                 sensitive: bool|None, spoiler_text: str|None,
+                 privacy: Privacy|None, lang: str|None,
+                 scheduled_at: datetime|str|None) -> dict[str, object]:
+    '''Form body shared by the posting, scheduling and editing methods,
+    with unset values dropped'''
+    return {k: v for k, v in {
+        'status': text,
+        'media_ids': _media_ids(media),
+        'in_reply_to_id': reply_to,
+        'poll': _poll_data(poll) if poll else None,
+        'sensitive': sensitive,
+        'spoiler_text': spoiler_text,
+        'visibility': _PRIVACY_STR[privacy] if privacy else None,
+        'language': lang,
+        'scheduled_at': (scheduled_at if isinstance(scheduled_at, str)
+            else _iso(scheduled_at)) if scheduled_at else None,
+    }.items() if v}
 
 class Mastodon(MastodonPublic):
     '''
     Mastodon API client
     '''
+    __slots__ = ('lang',)
+
     # ISO 639 language code
     lang: str
 
-    def __init__(self, instance_url: str, auth: OAuth2, lang: str = "en"):
-        super().__init__(instance_url, auth)
+    def __init__(self, instance_url: str, auth: OAuth2, lang: str = "en",
+                 pool_size: int = 10):
+        super().__init__(instance_url, auth, pool_size)
         self.lang = lang
 
-    async def _load_or_download_file(self, file: str|tuple[str, IO[bytes]|bytes], max_bytes: int|None=None) -> tuple[str, bytes]:
+    async def _stream_download(self, url: str, max_bytes: int|None) -> AsyncIterator[bytes]:
+        if max_bytes: # reject oversized files before transferring anything
+            async with self._client.head(url) as h:
+                _check_size(int(h.headers.get('Content-Length', 0)), max_bytes)
+        async with self._client.get(url) as r:
+            if r.status != 200:
+                raise ValueError(F"Failed to download file: {r.status}")
+            elif max_bytes:
+                _check_size(r.content_length or 0, max_bytes)
+            total = 0
+            async for chunk in r.content.iter_chunked(_CHUNK_SIZE):
+                total += len(chunk)
+                if max_bytes: # enforce even if Content-Length lied or was absent
+                    _check_size(total, max_bytes)
+                yield chunk
+
+    async def _load_or_download_file(self, file: str|tuple[str, IO[bytes]|bytes], max_bytes: int|None=None) -> tuple[str, bytes|memoryview|AsyncIterable[bytes]]:
+        import aiofiles.os # deferred: only upload paths need it
         match file:
-            case str(path) if os.path.isfile(path):
-                filename = os.path.basename(path)
-                size = (await aiofiles.os.stat(path)).st_size
-                _check_size(size, max_bytes)
-                async with aiofiles.open(path, "rb") as f:
-                    return filename, await f.read()
-            case str(url) if path := urllib3.util.parse_url(url).path:
+            case str(path) if "://" not in path:
+                try: # one async stat: size check and existence together
+                    st = await aiofiles.os.stat(path)
+                except OSError:
+                    raise ValueError(F"File not found: {path}") from None
+                if not stat.S_ISREG(st.st_mode):
+                    raise ValueError(F"File not found: {path}")
+                _check_size(st.st_size, max_bytes)
+                return os.path.basename(path), _stream_file(path)
+            case str(url) if path := urlsplit(url).path:
                 filename = os.path.basename(path)
-                async with self._client.get(url) as r:
-                    if r.status != 200:
-                        raise ValueError(F"Failed to download file: {r.status}")
-                    elif max_bytes:
-                        _check_size(r.content_length or float('inf'), max_bytes)
-                    return filename, await r.read()
+                return filename, self._stream_download(url, max_bytes)
             case str(other):
                 raise ValueError(F"File not found: {other}")
             case (filename, bytes(b)):
                 _check_size(len(b), max_bytes)
                 return filename, b
+            case (filename, BytesIO() as io):
+                # zero-copy view of the buffer instead of a bytes copy
+                buf = io.getbuffer()
+                _check_size(len(buf), max_bytes)
+                return filename, buf
             case (filename, io):
                 io = cast(IO[bytes], io)
                 if max_bytes:
@@ -187,7 +261,7 @@ class Mastodon(MastodonPublic):
                     io.seek(0)
                 return filename, io.read()
 
-    def set_default_lanuage(self, lang: str):
+    def set_default_language(self, lang: str):
         '''
         Set the default language used to annotate posts with
         ISO 639
@@ -204,19 +278,11 @@ class Mastodon(MastodonPublic):
     async def _statuses_post(self, text: str|None = None, media: list[str|MediaAttachment]|None = None, reply_to: str|None = None, poll: PollSetup|None = None, sensitive: bool|None = None, spoiler_text: str|None = None, privacy: Privacy|None = None, scheduled_at: None = None, lang: str|None = None) -> Post: ...
 
     @overload
-    async def _statuses_post(self, text: str|None, media: list[str|MediaAttachment]|None, reply_to: str|None, poll: PollSetup|None, sensitive: bool|None, spoiler_text: str|None, privacy: Privacy|None, scheduled_at: datetime, lang: str|None) -> ScheduledPost: ...
+    async def _statuses_post(self, text: str|None, media: list[str|MediaAttachment]|None, reply_to: str|None, poll: PollSetup|None, sensitive: bool|None, spoiler_text: str|None, privacy: Privacy|None, scheduled_at: datetime|str, lang: str|None) -> ScheduledPost: ...
     
-    async def _statuses_post(self, text: str|None = None, media: list[str|MediaAttachment]|None = None, reply_to: str|None = None, poll: PollSetup|None = None, sensitive: bool|None = None, spoiler_text: str|None = None, privacy: Privacy|None = None, scheduled_at: datetime|None = None, lang: str|None = None) -> Post|ScheduledPost:
-        data = {}
-        if text: data["status"] = text
-        if media: data['media_ids'] = _media_ids(media)
-        if reply_to: data['in_reply_to_id'] = reply_to
-        if poll: data['poll'] = asdict(poll)
-        if sensitive: data['sensitive'] = sensitive
-        if spoiler_text: data['spoiler_text'] = spoiler_text
-        if privacy: data['visibility'] = privacy.value
-        if lang: data['language'] = lang
-        if scheduled_at: data['scheduled_at'] = scheduled_at.isoformat()
+    async def _statuses_post(self, text: str|None = None, media: list[str|MediaAttachment]|None = None, reply_to: str|None = None, poll: PollSetup|None = None, sensitive: bool|None = None, spoiler_text: str|None = None, privacy: Privacy|None = None, scheduled_at: datetime|str|None = None, lang: str|None = None) -> Post|ScheduledPost:
+        data = _status_data(text, media, reply_to, poll, sensitive,
+                            spoiler_text, privacy, lang, scheduled_at)
         kind = ScheduledPost if scheduled_at is None else Post
         return await self._post(kind, "v1/statuses", data=data)
     
@@ -227,8 +293,14 @@ class Mastodon(MastodonPublic):
                    sensitive: bool = False,
                    spoiler_text: str|None = None,
                    privacy: Privacy = Privacy.PUBLIC,
-                   lang: str|None = None) -> Post:
-        '''Make a new post'''
+                   lang: str|None = None,
+                   media_files: list[str|tuple[str, bytes|IO[bytes]]]|None = None) -> Post:
+        '''Make a new post
+        Files in `media_files` are uploaded concurrently and attached after
+        anything already in `media`'''
+        if media_files:
+            media = (media or []) + \
+                cast(list[str|MediaAttachment], await self.upload_many(media_files))
         return await self._statuses_post(text, media, reply_to, sensitive=sensitive, spoiler_text=spoiler_text, privacy=privacy, lang=lang)
     
     async def post_media(self,
@@ -262,40 +334,32 @@ class Mastodon(MastodonPublic):
                         scheduled_at: datetime|None = None, 
                         lang: str|None = None) -> Post:
         '''Replace an existing post'''
-        data = {}
-        if text: data["status"] = text
-        if media: data['media_ids'] = _media_ids(media)
-        if reply_to: data['in_reply_to_id'] = reply_to
-        if poll: data['poll'] = poll
-        if sensitive: data['sensitive'] = sensitive
-        if spoiler_text: data['spoiler_text'] = spoiler_text
-        if privacy: data['visibility'] = privacy.value
-        if lang: data['language'] = lang
-        if scheduled_at: data['scheduled_at'] = scheduled_at.isoformat()
-        return await self._put(Post, F"v1/statuses/{post_id}", data=data)
+        data = _status_data(text, media, reply_to, poll, sensitive,
+                            spoiler_text, privacy, lang, scheduled_at)
+        return await self._put(Post, _U_STATUSES + post_id, data=data)
     
     async def get_my_post(self, post_id: str) -> AuthorizedPost:
         '''Get a post with extra info, if posted by the authorized user, by ID'''
-        return await self._get(AuthorizedPost, F"v1/statuses/{post_id}")
+        return await self._get(AuthorizedPost, _U_STATUSES + post_id)
     
     async def delete_post(self, post_id: str) -> DeletedPost:
         '''Delete a post by ID'''
-        return await self._delete(DeletedPost, F"v1/statuses/{post_id}")
+        return await self._delete(DeletedPost, _U_STATUSES + post_id)
     
     async def boost(self, post_id: str, privacy: Privacy = Privacy.PUBLIC):
         '''Boost a post'''
-        data = { "visibility": privacy.value }
-        await self._post(None, F"v1/statuses/{post_id}/reblog", data=data)
+        data = { "visibility": _PRIVACY_STR[privacy] }
+        await self._post(None, _U_STATUSES + post_id + "/reblog", data=data)
 
-    async def schedule_post(self, text: str, scheduled_at: datetime, media: list[str|MediaAttachment]|None = None, reply_to: str|None = None, sensitive: bool = False, spoiler_text: str|None = None, privacy: Privacy = Privacy.PUBLIC,lang: str|None = None) -> ScheduledPost:
+    async def schedule_post(self, text: str, scheduled_at: datetime|str, media: list[str|MediaAttachment]|None = None, reply_to: str|None = None, sensitive: bool = False, spoiler_text: str|None = None, privacy: Privacy = Privacy.PUBLIC,lang: str|None = None) -> ScheduledPost:
         '''Schedule a new post, at least 5 minutes in the future'''
         return await self._statuses_post(text, media, reply_to, None, sensitive, spoiler_text, privacy, scheduled_at, lang)
     
-    async def schedule_media(self, media: list[str|MediaAttachment], scheduled_at: datetime, reply_to: str|None = None, sensitive: bool = False, spoiler_text: str|None = None, privacy: Privacy = Privacy.PUBLIC,lang: str|None = None) -> ScheduledPost:
+    async def schedule_media(self, media: list[str|MediaAttachment], scheduled_at: datetime|str, reply_to: str|None = None, sensitive: bool = False, spoiler_text: str|None = None, privacy: Privacy = Privacy.PUBLIC,lang: str|None = None) -> ScheduledPost:
         '''Schedule a new post with no text and only images, at least 5 minutes in the future'''
         return await self._statuses_post(None, media, reply_to, None, sensitive, spoiler_text, privacy, scheduled_at, lang)
     
-    async def schedule_poll(self, text: str, poll: PollSetup, scheduled_at: datetime, reply_to: str|None = None, sensitive: bool = False, spoiler_text: str|None = None, privacy: Privacy = Privacy.PUBLIC,lang: str|None = None) -> ScheduledPost:
+    async def schedule_poll(self, text: str, poll: PollSetup, scheduled_at: datetime|str, reply_to: str|None = None, sensitive: bool = False, spoiler_text: str|None = None, privacy: Privacy = Privacy.PUBLIC,lang: str|None = None) -> ScheduledPost:
         '''Schedule a new post with a poll, at least 5 minutes in the future'''
         return await self._statuses_post(text, None, reply_to, poll, sensitive, spoiler_text, privacy, scheduled_at, lang)
     
@@ -324,22 +388,37 @@ class Mastodon(MastodonPublic):
             else:
                 raise await ApiError.from_resposnse(r)
 
-    async def _check_media_upload(self, media_id: str) -> MediaAttachment|None:
-        async with await self._request_context(Method.GET, F"media/{media_id}") as r:
+    async def _check_media_upload(self, media_id: str) -> tuple[MediaAttachment|None, float|None]:
+        async with await self._request_context(Method.GET, _U_MEDIA + media_id) as r:
             if r.status == 200:
-                return MediaAttachment.from_json(await r.json())
-            elif r.status == 206:
-                return None
+                return MediaAttachment.from_json(await r.json()), None
+            elif r.status == 206: # still processing
+                retry_after = None
+                if (header := r.headers.get('Retry-After')) is not None:
+                    try:
+                        retry_after = float(header)
+                    except ValueError:
+                        pass # HTTP-date form: fall back to our own delay
+                return None, retry_after
             else:
                 raise await ApiError.from_resposnse(r)
-            
-    async def media(self, media_id: str) -> MediaAttachment:
-        '''Get information about a media file'''
-        while (media :=
-               await self._check_media_upload(media_id)) is None:
-            # wait for the media to finish uploading
-            await asyncio.sleep(1)
-        return media
+
+    async def media(self, media_id: str, max_wait: float = 60.0) -> MediaAttachment:
+        '''Get information about a media file, waiting up to `max_wait`
+        seconds for the server to finish processing it'''
+        delay = 0.5
+        waited = 0.0
+        while True:
+            media, retry_after = await self._check_media_upload(media_id)
+            if media is not None:
+                return media
+            if waited >= max_wait:
+                raise TimeoutError(F"Media {media_id} not processed after {max_wait}s")
+            # back off exponentially unless the server says when to retry
+            wait = min(retry_after or delay, max_wait - waited)
+            await asyncio.sleep(wait)
+            waited += wait
+            delay = min(delay * 2, 8.0)
             
     async def upload(self, file: str|tuple[str, bytes|IO[bytes]], thumbnail: str|tuple[str, bytes|IO[bytes]]|None=None, description: str|None=None, focus: tuple[float, float]|None=None) -> MediaAttachment:
         '''Upload a file to the server'''
@@ -347,7 +426,12 @@ class Mastodon(MastodonPublic):
         if isinstance(media, UnuploadedMediaAttachment):
             media = await self.media(media.id)
         return media
-    
+
+    async def upload_many(self, files: list[str|tuple[str, bytes|IO[bytes]]]) -> list[MediaAttachment]:
+        '''Upload several files concurrently, so transfers and server-side
+        processing overlap instead of running back to back'''
+        return list(await asyncio.gather(*( self.upload(f) for f in files )))
+
     async def update_media(self, media: str|MediaAttachment|UnuploadedMediaAttachment, thumbnail: str|tuple[str, bytes|IO[bytes]]|None=None, description: str|None=None, focus: tuple[float, float]|None=None):
         data = FormData()
         media_id = media if isinstance(media, str) else media.id
@@ -363,5 +447,5 @@ class Mastodon(MastodonPublic):
             if max(abs(x), abs(y)) > 1:
                 raise ValueError("Focus must be a tuple of floats between -1 and 1")
             data.add_field('focus', F"{x},{y}")
-        await self._put(None, F"media/{media_id}", data=data)
+        await self._put(None, _U_MEDIA + media_id, data=data)
 
@@ -1,21 +1,115 @@
 '''
 Mastodon client for public API
 '''
+import asyncio
+import functools
+import json
+import re
+from datetime import datetime
+from enum import Enum
+from typing import Any
+from aiohttp import ClientSession, TCPConnector
 from SlyAPI import *
 from SlyAPI.auth import NoAuth
+from SlyAPI.asyncy import unmanage_async_context
+from SlyAPI.web import Method, ApiError, ParamsDict
 
 from .entities import *
+from .serialization import DataclassJsonMixin
+
+@functools.cache
+def _re_at_at() -> re.Pattern[str]:
+    'like @username@domain; compiled on first use to keep import cheap'
+    return re.compile(r'@(\w+)@([\w.-]+)')
+
+@functools.cache
+def _re_at() -> re.Pattern[str]:
+    'like @username'
+    return re.compile(r'@(\w+)')
+
+try: # optional C-accelerated JSON, installed with SlyMastodon[fast]
+    import orjson
+except ImportError:
+    orjson = None
+
+# hot-path URL prefixes, joined once instead of f-string formatting per call
+_U_ACCOUNTS = "v1/accounts/"
+_U_STATUSES = "v1/statuses/"
+
+def _json_default(o: Any) -> Any:
+    if isinstance(o, Enum):
+        return o.value
+    elif isinstance(o, datetime):
+        return o.isoformat()
+    raise TypeError(F"Cannot serialize {o!r} to JSON")
+
+def _encode_body(data: dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, default=_json_default)
+    return json.dumps(data, default=_json_default).encode()
 
 class MastodonPublic(WebAPI):
     '''
     Mastodon client for public API
     '''
 
-    def __init__(self, instance_url: str, auth: OAuth2|None = None):
+    # slot our own attributes; WebAPI is unslotted so the inherited
+    # __dict__ still exists for base_url and auth
+    __slots__ = ('_pool_size',)
+
+    # max concurrent connections to any one host
+    _pool_size: int
+
+    def __init__(self, instance_url: str, auth: OAuth2|None = None,
+                 pool_size: int = 10):
         super().__init__(auth or NoAuth(), True)
         if not instance_url.startswith('https://'):
             instance_url = F"https://{instance_url}"
         self.base_url = instance_url + "/api/"
+        self._pool_size = pool_size
+
+    @property
+    def _client(self) -> ClientSession:
+        # same lazy setup as WebAPI._client, but with keep-alive tuned so
+        # sequential requests reuse one TCP+TLS connection per host
+        if self._maybe_client is None:
+            self._maybe_client = ClientSession(connector=TCPConnector(
+                limit=100, limit_per_host=self._pool_size,
+                keepalive_timeout=75, ttl_dns_cache=300))
+            (_, self._client_close_context) = \
+                unmanage_async_context(self._maybe_client)
+        return self._maybe_client
+
+    async def _request_context(self, method: Method, path: str, params: ParamsDict|None=None, data: Any = None, headers: dict[str, str]|None=None):
+        if isinstance(data, dict):
+            # send plain dict bodies as JSON bytes instead of form fields
+            headers = (headers or {}) | {'Content-Type': 'application/json'}
+            data = _encode_body(data)
+        return await super()._request_context(method, path, params, data, headers)
+
+    async def _request(self, method: Method, returns: Any, path: str, params: ParamsDict|None=None, data: Any = None, headers: dict[str, str]|None=None):
+        is_entity = isinstance(returns, type) \
+            and issubclass(returns, DataclassJsonMixin)
+        if orjson is None and not is_entity:
+            return await super()._request(method, returns, path, params, data, headers)
+        ctx = await self._request_context(method, path, params, data, headers)
+        async with ctx as resp:
+            if resp.status >= 400:
+                raise await ApiError.from_resposnse(resp)
+            if returns is None:
+                return None
+            elif returns == str:
+                return await resp.text()
+            elif is_entity:
+                # decode straight from the body bytes, without building an
+                # intermediate dict when msgspec is installed
+                return returns.from_json_bytes(await resp.read())
+            else:
+                obj = orjson.loads(await resp.read()) # type: ignore - not None here
+                if hasattr(returns, 'from_json'):
+                    return getattr(returns, 'from_json')(obj)
+                else:
+                    return returns(obj)
 
     async def user(self, at_or_id: str) -> User:
         '''
@@ -24,10 +118,23 @@ class MastodonPublic(WebAPI):
         @user@domain : any other domain
         '''
         if at_or_id.startswith("@"):
-            return await self._get(User, "v1/accounts/lookup", {"acct": at_or_id[1:]} )
+            m = _re_at_at().fullmatch(at_or_id) or _re_at().fullmatch(at_or_id)
+            if m is None:
+                raise ValueError(F"Invalid account handle: {at_or_id}")
+            return await self._get(User, _U_ACCOUNTS + "lookup", {"acct": m.group(0)[1:]} )
         else: # ID
-            return await self._get(User, F"v1/accounts/{at_or_id}")
+            return await self._get(User, _U_ACCOUNTS + at_or_id)
     
+    async def users(self, at_or_ids: list[str]) -> list[User]:
+        '''Lookup several accounts concurrently'''
+        return list(await asyncio.gather(*(
+            self.user(at_or_id) for at_or_id in at_or_ids )))
+
     async def get_post(self, post_id: str) -> Post:
         '''Get a post by ID'''
-        return await self._get(Post, F"v1/statuses/{post_id}")
\ No newline at end of file
+        return await self._get(Post, _U_STATUSES + post_id)
+
+    async def get_posts(self, post_ids: list[str]) -> list[Post]:
+        '''Get several posts by ID concurrently'''
+        return list(await asyncio.gather(*(
+            self.get_post(post_id) for post_id in post_ids )))
\ No newline at end of file
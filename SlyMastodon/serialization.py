@@ -4,25 +4,533 @@ Extended support for deserialization of Python types from JSON
 from dataclasses import fields, is_dataclass
 import sys
 from types import NoneType
-from typing import TypeVar
+from typing import Any, Callable, ForwardRef, TypeVar, Union, get_args, get_origin, get_type_hints
 from types import UnionType
 from enum import Enum
+from functools import partial
 from datetime import datetime
 import inspect
 
 from SlyAPI.web import JsonTypeCo
 
+try: # optional C-accelerated decoding, installed with SlyMastodon[fast]
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try: # optional C ISO-8601 parser, also part of SlyMastodon[fast]
+    from ciso8601 import parse_datetime as _fromisoformat
+except ImportError:
+    _fromisoformat = datetime.fromisoformat
+
 T = TypeVar('T')
 
-def _dataclass_from_json(cls: type[T], value: JsonTypeCo, typevars: dict[str, type]) -> T:
-    if not isinstance(value, dict):
-        raise TypeError(F"Failed to convert {value} to {cls}")
-    return cls(**{
-        f.name: convert_from_json(f.type, value[f.name], typevars, cls)
-        for f in fields(cls)
-    })
+# JSON-native leaf types, hashed rather than scanned as a tuple
+_PRIMITIVES = frozenset((int, str, bool, float, NoneType))
+
+_DECODER_CACHE: dict[type, Any] = {}
+
+def _bytes_decoder(cls: type) -> Any:
+    '''A cached `msgspec.json.Decoder` for `cls`, or None if msgspec is
+    not installed or cannot handle the class'''
+    if cls in _DECODER_CACHE:
+        return _DECODER_CACHE[cls]
+    decoder = None
+    if msgspec is not None:
+        try:
+            decoder = msgspec.json.Decoder(cls)
+        except Exception:
+            # e.g. fields msgspec cannot express, or recursive forward
+            # references it cannot resolve (NameError); use the fallback
+            pass
+    _DECODER_CACHE[cls] = decoder
+    return decoder
+
+_FROM_JSON_CACHE: dict[type, Callable[[JsonTypeCo], Any]] = {}
+
+# converters and enum tables shared between all generated from_json
+# functions, so e.g. list[Emoji] on User and on Post bind the same object
+_NESTED_CACHE: dict[type, Callable[[JsonTypeCo], Any]] = {}
+# classes whose converter is currently being compiled; only references
+# into this set (i.e. cycles) need a late-binding trampoline
+_BUILDING: set[Any] = set()
+_ENUM_TABLE_CACHE: dict[type, dict[Any, Any]] = {}
+_GENERIC_CONVERTERS: dict[Any, tuple[str, Callable[[JsonTypeCo], Any]]] = {}
+
+def _nested_from_json(cls: type) -> Callable[[JsonTypeCo], Any]:
+    '''Late-binding converter for dataclass-typed fields, so mutually
+    recursive classes (e.g. `Post.reblog`) can reference each other'''
+    cached = _NESTED_CACHE.get(cls)
+    if cached is not None:
+        return cached
+    def _fj(value: JsonTypeCo):
+        fn = _FROM_JSON_CACHE.get(cls)
+        if fn is None:
+            fn = _build_from_json(cls)
+        return fn(value)
+    _NESTED_CACHE[cls] = _fj
+    return _fj
+
+def _enum_table(cls: type) -> dict[Any, Any]:
+    '''A shared value -> member table for an Enum'''
+    table = _ENUM_TABLE_CACHE.get(cls)
+    if table is None:
+        table = {m.value: m for m in cls} # type: ignore - cls is an Enum
+        _ENUM_TABLE_CACHE[cls] = table
+    return table
+
+_ENUM_CONVERTER_CACHE: dict[type, Callable[[Any], Any]] = {}
+
+def _enum_from_value(cls: type) -> Callable[[Any], Any]:
+    '''Member lookup through the shared table, raising Enum's usual
+    ValueError on a bad value rather than a KeyError the generated
+    `from_json` would misreport as a missing field'''
+    fn = _ENUM_CONVERTER_CACHE.get(cls)
+    if fn is None:
+        table = _enum_table(cls)
+        def fn(value: Any):
+            try:
+                return table[value]
+            except KeyError:
+                raise ValueError(
+                    F"{value!r} is not a valid {cls.__name__}") from None
+        _ENUM_CONVERTER_CACHE[cls] = fn
+    return fn
+
+def _generic_converter(tp: Any) -> tuple[str, Callable[[JsonTypeCo], Any]]:
+    '''A shared (name, converter) pair for types without a specialized
+    code path, bound once per distinct type'''
+    entry = _GENERIC_CONVERTERS.get(tp)
+    if entry is None:
+        entry = (F"_g{len(_GENERIC_CONVERTERS)}", partial(convert_from_json, tp))
+        _GENERIC_CONVERTERS[tp] = entry
+    return entry
+
+def _field_source(tp: Any, expr: str, ns: dict[str, Any], depth: int = 0,
+                  parent: type|None = None) -> str:
+    '''Emit a source expression converting `expr` to `tp` for the
+    generated `from_json`'''
+    if tp in _PRIMITIVES:
+        return expr
+    if tp is datetime:
+        # either parser accepts the trailing Z Mastodon emits
+        ns['_fromiso'] = _fromisoformat
+        return F"_fromiso({expr})"
+    if get_origin(tp) is list:
+        item, = get_args(tp)
+        var = F"_x{depth}"
+        inner = _field_source(item, var, ns, depth + 1, parent)
+        if inner == var: # list of primitives: copy directly
+            return F"list({expr})"
+        return F"[{inner} for {var} in {expr}]"
+    if isinstance(tp, type) and issubclass(tp, Enum):
+        # value -> member table lookup, skipping Enum.__call__
+        name = F"_m_{tp.__name__}"
+        ns[name] = _enum_from_value(tp)
+        return F"{name}({expr})"
+    if isinstance(tp, type) and is_dataclass(tp):
+        name = F"_fj_{tp.__name__}"
+        fn = _FROM_JSON_CACHE.get(tp)
+        if fn is not None: # already compiled: call it with no indirection
+            ns[name] = fn
+        elif tp in _BUILDING: # cycle: defer binding until first call
+            ns[name] = _nested_from_json(tp)
+        else: # compile eagerly, flattening the call at every use site
+            try:
+                ns[name] = _build_from_json(tp)
+            except (NameError, TypeError):
+                # annotations that cannot resolve yet: stay lazy, as the
+                # field may never carry a value (e.g. always empty lists)
+                ns[name] = _nested_from_json(tp)
+        return F"{name}({expr})"
+    if type(tp) is str:
+        # delayed annotation: evaluate in the defining module when the
+        # first value arrives, like the generic path does
+        name = F"_d{len(ns)}"
+        ns[name] = partial(convert_from_json, tp, parent=parent)
+        return F"{name}({expr})"
+    # anything else falls back to the generic converter,
+    # with the resolved type pre-bound
+    name, fn = _generic_converter(tp)
+    ns[name] = fn
+    return F"{name}({expr})"
+
+def _arg_source(field_name: str, tp: Any, ns: dict[str, Any], i: int,
+                parent: type|None = None) -> str:
+    '''Emit the constructor argument expression for one field.
+
+    Fields that allow None read with obj.get, tolerating absence;
+    required fields index directly and rely on the surrounding KeyError
+    handler.
+    '''
+    if get_origin(tp) in (UnionType, Union): # either union spelling
+        args = get_args(tp)
+        if len(args) == 2 and NoneType in args:
+            inner, = (a for a in args if a is not NoneType)
+            var = F"_v{i}"
+            inner_src = _field_source(inner, var, ns, parent=parent)
+            if inner_src == var: # optional primitive: pass through
+                return F"obj.get({field_name!r})"
+            return F"(None if ({var} := obj.get({field_name!r})) is None else {inner_src})"
+    return _field_source(tp, F"obj[{field_name!r}]", ns, parent=parent)
+
+def _build_from_json(cls: type[T]) -> Callable[[JsonTypeCo], T]:
+    '''Compile a specialized `from_json` for a concrete dataclass.
+
+    The generated function indexes the JSON object directly and calls
+    pre-bound converters, instead of re-inspecting field types per call.
+    '''
+    if getattr(cls, '__parameters__', ()): # generic: no specialization
+        fn = lambda value: _dataclass_from_json(cls, value, {})
+        _FROM_JSON_CACHE[cls] = fn
+        return fn
+    try:
+        hints = get_type_hints(cls)
+    except (NameError, TypeError):
+        # unresolvable forward reference (e.g. SlyAPI's recursive JsonType
+        # in JsonMap): keep the string annotations and let _field_source
+        # bind delayed converters for them, as _resolved_fields does
+        hints = {f.name: f.type for f in fields(cls)}
+    ns: dict[str, Any] = {'_cls': cls}
+    _BUILDING.add(cls)
+    try:
+        converted = [
+            (f.name, _arg_source(f.name, hints[f.name], ns, i, cls))
+            for i, f in enumerate(fields(cls))
+        ]
+    finally:
+        _BUILDING.discard(cls)
+    params = getattr(cls, '__dataclass_params__', None)
+    if not hasattr(cls, '__post_init__') and not (params and params.frozen):
+        # skip __init__ entirely: allocate with __new__ and store fields
+        # in a straight line
+        ns['_new'] = cls.__new__
+        body = (     "        _o = _new(_cls)\n"
+            + "".join(F"        _o.{name} = {src}\n" for name, src in converted)
+            +        "        return _o\n")
+    elif any(f.kw_only for f in fields(cls)):
+        # kw_only fields are moved to the end of __init__: pass by name
+        args = ", ".join(F"{name}={src}" for name, src in converted)
+        body = F"        return _cls({args})\n"
+    else:
+        # positional: field order is __init__ parameter order
+        args = ", ".join(src for _, src in converted)
+        body = F"        return _cls({args})\n"
+    src = (
+         "def _fj(obj):\n"
+         "    if not isinstance(obj, dict):\n"
+        F"        raise TypeError(F\"Failed to convert {{obj}} to {cls.__name__}\")\n"
+         "    try:\n"
+        F"{body}"
+         "    except KeyError as e:\n"
+        F"        raise ValueError(F\"Missing expected field {{e.args[0]}} for {cls.__name__}\") from None"
+    )
+    exec(src, ns)
+    fn = ns['_fj']
+    _FROM_JSON_CACHE[cls] = fn
+    return fn
+
+_FIELDS_CACHE: dict[type, tuple[tuple[str, Any], ...]] = {}
+
+def _resolved_fields(cls: type) -> tuple[tuple[str, Any], ...]:
+    '''(name, type) pairs for a dataclass, with string annotations
+    resolved once and cached on first use'''
+    cached = _FIELDS_CACHE.get(cls)
+    if cached is None:
+        try:
+            hints = get_type_hints(cls)
+            cached = tuple((f.name, hints[f.name]) for f in fields(cls))
+        except (NameError, TypeError):
+            # unresolvable forward reference: let the string-annotation
+            # branch of convert_from_json deal with it per field
+            cached = tuple((f.name, f.type) for f in fields(cls))
+        _FIELDS_CACHE[cls] = cached
+    return cached
+
+# resolved delayed annotations, keyed by (string, defining module) so
+# eval runs at most once per annotation
+_EVAL_CACHE: dict[tuple[str, str|None], Any] = {}
+
+def _eval_annotation(annotation: str, parent: type|None) -> Any:
+    module = parent.__module__ if parent is not None else None
+    key = (annotation, module)
+    t = _EVAL_CACHE.get(key)
+    if t is None:
+        cls_globals = vars(sys.modules[module]) if module is not None else {}
+        t = eval(annotation, cls_globals)
+        _EVAL_CACHE[key] = t
+    return t
+
+# compiled converters for the generic path, keyed by (dataclass, bound
+# type variables) so e.g. Test[int] and Test[str] specialize separately
+_CONVERTER_CACHE: dict[tuple[type, tuple[tuple[str, Any], ...]], Callable[[JsonTypeCo], Any]] = {}
+
+def _typevars_key(typevars: dict[TypeVar, type]) -> tuple[tuple[TypeVar, Any], ...]:
+    # TypeVars are not orderable; their names give a stable order
+    return tuple(sorted(typevars.items(), key=lambda kv: str(kv[0])))
+
+def _dataclass_converter(cls: type, typevars: dict[TypeVar, type]) -> Callable[[JsonTypeCo], Any]:
+    '''Converter for a dataclass field: bound directly where possible,
+    through a late-binding trampoline only for recursive references
+    (e.g. `Post.reblog`) whose converter is still being compiled'''
+    key = (cls, _typevars_key(typevars))
+    fn = _CONVERTER_CACHE.get(key)
+    if fn is not None:
+        return fn
+    if key in _BUILDING:
+        def _dc(value: JsonTypeCo):
+            fn = _CONVERTER_CACHE.get(key)
+            if fn is None:
+                fn = _build_dataclass_converter(cls, typevars)
+            return fn(value)
+        return _dc
+    return _build_dataclass_converter(cls, typevars)
+
+def _union_converter_for(tp: Any, typevars: dict[TypeVar, type], parent: type|None) -> Callable[[JsonTypeCo], Any]:
+    '''Compiled converter for a union, in either the `A|B` or the
+    `Union[A, B]` spelling'''
+    args = getattr(tp, '__args__')
+    members = frozenset(args)
+    inners = tuple(_converter_for(t, typevars, parent) for t in args)
+    def _union(value: JsonTypeCo):
+        if type(value) in members:
+            return value
+        for fn in inners:
+            try:
+                return fn(value)
+            except TypeError:
+                pass
+        raise TypeError(F"Failed to convert {value} to {tp}")
+    return _union
+
+def _converter_for(tp: Any, typevars: dict[TypeVar, type], parent: type|None) -> Callable[[JsonTypeCo], Any]:
+    '''Decide the conversion for `tp` once, returning a specialized
+    callable in place of re-running the dispatch ladder per value'''
+    if inspect.isabstract(tp):
+        raise TypeError("Conversion type must be concrete")
+    if tp in _PRIMITIVES:
+        def _prim(value: JsonTypeCo):
+            if isinstance(value, tp):
+                return value
+            raise TypeError(F"No known conversion from {value} to {tp}")
+        return _prim
+    from_json = getattr(tp, 'from_json', None)
+    if from_json is not None: # overridden deserialization
+        return from_json
+    origin = getattr(tp, '__origin__', None)
+    if origin is not None: # generics
+        if origin is Union: # typing.Union[A, B], same handling as A|B
+            return _union_converter_for(tp, typevars, parent)
+        args = getattr(tp, '__args__')
+        if origin is list:
+            item, = args
+            if item in _PRIMITIVES:
+                # homogeneous primitive payload: validate in one pass and
+                # shallow-copy, instead of a converter call per element
+                def _prim_list(value: JsonTypeCo):
+                    if not isinstance(value, list):
+                        raise TypeError(F"Failed to convert {value} to {tp}")
+                    for v in value:
+                        if not isinstance(v, item):
+                            raise TypeError(F"No known conversion from {v} to {item}")
+                    return value.copy()
+                return _prim_list
+            inner = _converter_for(item, typevars, parent)
+            def _seq(value: JsonTypeCo):
+                if not isinstance(value, list):
+                    raise TypeError(F"Failed to convert {value} to {tp}")
+                return [inner(v) for v in value]
+            return _seq
+        elif origin is set:
+            item, = args
+            inner = _converter_for(item, typevars, parent)
+            def _set(value: JsonTypeCo):
+                if not isinstance(value, list):
+                    raise TypeError(F"Failed to convert {value} to {tp}")
+                return {inner(v) for v in value}
+            return _set
+        elif origin is tuple:
+            inners = tuple(_converter_for(t, typevars, parent) for t in args)
+            def _tup(value: JsonTypeCo):
+                if not isinstance(value, list):
+                    raise TypeError(F"Failed to convert {value} to {tp}")
+                return tuple([fn(v) for fn, v in zip(inners, value)])
+            return _tup
+        elif origin is dict:
+            _kt, vt = args
+            vconv = _converter_for(vt, typevars, parent)
+            def _map(value: JsonTypeCo):
+                if not isinstance(value, dict):
+                    raise TypeError(F"Failed to convert {value} to {tp}")
+                return { k: vconv(v) for k, v in value.items() }
+            return _map
+        elif is_dataclass(origin):
+            newtypevars = typevars | {
+                var: t # like ~T: int, keyed by the TypeVar itself
+                for var, t in zip(getattr(origin, '__parameters__'), args)
+            }
+            return _dataclass_converter(origin, newtypevars)
+        else:
+            def _no(value: JsonTypeCo):
+                raise TypeError(F"Failed to convert {value} to {tp}")
+            return _no
+    if type(tp) is TypeVar:
+        if tp in typevars:
+            return _converter_for(typevars[tp], typevars, tp)
+        def _unbound(value: JsonTypeCo):
+            raise ValueError(F"Unbound generic type variable {tp}")
+        return _unbound
+    if type(tp) is UnionType:
+        return _union_converter_for(tp, typevars, parent)
+    if is_dataclass(tp):
+        return _dataclass_converter(tp, typevars)
+    if tp == datetime:
+        def _dt(value: JsonTypeCo):
+            if isinstance(value, str):
+                return _fromisoformat(value)
+            elif isinstance(value, (int, float)):
+                return datetime.fromtimestamp(value)
+            raise TypeError(F"Failed to convert {value} to {tp}")
+        return _dt
+    if isinstance(tp, type) and issubclass(tp, Enum):
+        def _enum(value: JsonTypeCo):
+            if not isinstance(value, (str, int)):
+                raise TypeError(F"Failed to convert {value} to {tp}")
+            return tp(value)
+        return _enum
+    if type(tp) is ForwardRef: # unresolved reference from get_type_hints
+        return _converter_for(tp.__forward_arg__, typevars, parent)
+    if type(tp) is str: # delayed annotation, possibly part of a recursive
+        # alias like JsonType: evaluate when the first value arrives
+        resolved: Callable[[JsonTypeCo], Any]|None = None
+        def _delayed(value: JsonTypeCo):
+            nonlocal resolved
+            if resolved is None:
+                resolved = _converter_for(
+                    _eval_annotation(tp, parent), typevars, parent)
+            return resolved(value)
+        return _delayed
+    def _unknown(value: JsonTypeCo):
+        raise TypeError(F"No known conversion from {value} to {tp}")
+    return _unknown
+
+def _build_dataclass_converter(cls: type, typevars: dict[TypeVar, type]) -> Callable[[JsonTypeCo], Any]:
+    '''Compile the per-field converters for a dataclass once; repeat
+    conversions of the same type just call them in order'''
+    key = (cls, _typevars_key(typevars))
+    _BUILDING.add(key)
+    try:
+        converters = tuple(
+            (name, _converter_for(t, typevars, cls))
+            for name, t in _resolved_fields(cls))
+    finally:
+        _BUILDING.discard(key)
+    if any(f.kw_only for f in fields(cls)):
+        # kw_only fields are moved to the end of __init__, breaking the
+        # positional order below: pass by name
+        def _conv(value: JsonTypeCo):
+            if not isinstance(value, dict):
+                raise TypeError(F"Failed to convert {value} to {cls}")
+            return cls(**{ name: fn(value[name]) for name, fn in converters })
+    else:
+        def _conv(value: JsonTypeCo):
+            if not isinstance(value, dict):
+                raise TypeError(F"Failed to convert {value} to {cls}")
+            # positional: field order is __init__ parameter order, and it
+            # skips building and unpacking a kwargs dict
+            return cls(*[fn(value[name]) for name, fn in converters])
+    _CONVERTER_CACHE[key] = _conv
+    return _conv
+
+def _dataclass_from_json(cls: type[T], value: JsonTypeCo, typevars: dict[TypeVar, type]) -> T:
+    fn = _CONVERTER_CACHE.get((cls, _typevars_key(typevars)))
+    if fn is None:
+        fn = _build_dataclass_converter(cls, typevars)
+    return fn(value)
+
+# dispatch tags for convert_from_json, so the reflective checks
+# (isabstract, is_dataclass, issubclass, ...) run once per type
+_KIND_ABSTRACT = 0
+_KIND_PRIMITIVE = 1
+_KIND_FROM_JSON = 2
+_KIND_GENERIC = 3
+_KIND_DATACLASS = 4
+_KIND_DATETIME = 5
+_KIND_ENUM = 6
+_KIND_OTHER = 7
+
+_KIND_CACHE: dict[Any, int] = {}
+
+# (origin, args) decomposition per generic alias, since the __origin__
+# and __args__ lookups repeat for every element of nested containers
+_GENERIC_INFO: dict[Any, tuple[Any, tuple[Any, ...]]] = {}
+
+# bound from_json classmethods, so the overridden-deserialization branch
+# does one dict probe instead of an attribute lookup per value
+_BOUND_FROM_JSON: dict[type, Callable[[JsonTypeCo], Any]] = {}
+
+def _classify(cls: Any) -> int:
+    '''Evaluate the dispatch ladder once for a type, caching a small tag'''
+    if inspect.isabstract(cls):
+        kind = _KIND_ABSTRACT
+    elif cls in _PRIMITIVES:
+        kind = _KIND_PRIMITIVE
+    elif getattr(cls, 'from_json', None) is not None:
+        kind = _KIND_FROM_JSON
+    elif getattr(cls, '__origin__', None) is not None:
+        kind = _KIND_GENERIC
+    elif is_dataclass(cls):
+        kind = _KIND_DATACLASS
+    elif cls == datetime:
+        kind = _KIND_DATETIME
+    elif isinstance(cls, type) and issubclass(cls, Enum):
+        kind = _KIND_ENUM
+    else:
+        kind = _KIND_OTHER
+    _KIND_CACHE[cls] = kind
+    return kind
+
+def _convert_typevar(cls: TypeVar, value: JsonTypeCo, typevars: dict[TypeVar, type], parent: type|None) -> Any:
+    if cls not in typevars:
+        raise ValueError(F"Unbound generic type variable {cls}")
+    return convert_from_json(typevars[cls], value, typevars, cls) # type: ignore
+
+# per-union set of member types, for a hashed pass-through probe of
+# values that already have the right type instead of a tuple scan
+_UNION_MEMBERS: dict[UnionType, frozenset[Any]] = {}
+
+def _convert_union(cls: UnionType, value: JsonTypeCo, typevars: dict[TypeVar, type], parent: type|None) -> Any:
+    members = _UNION_MEMBERS.get(cls)
+    if members is None:
+        members = frozenset(getattr(cls, '__args__'))
+        _UNION_MEMBERS[cls] = members
+    if type(value) in members:
+        return value # value is already of the correct type
+    for t in getattr(cls, '__args__'):
+        try:
+            return convert_from_json(t, value, typevars, parent)
+        except TypeError:
+            pass
+    raise TypeError(F"Failed to convert {value} to {cls}")
+
+def _convert_forwardref(cls: ForwardRef, value: JsonTypeCo, typevars: dict[TypeVar, type], parent: type|None) -> Any:
+    # unresolved reference from get_type_hints
+    return convert_from_json(cls.__forward_arg__, value, typevars, parent) # type: ignore
+
+def _convert_annotation(cls: str, value: JsonTypeCo, typevars: dict[TypeVar, type], parent: type|None) -> Any:
+    return convert_from_json(_eval_annotation(cls, parent), value, typevars, parent)
 
-def convert_from_json(cls: type[T], value: JsonTypeCo, typevars_: dict[str, type]|None = None, parent: type|None = None) -> T:
+# non-type handlers, dispatched on type(cls) in one probe; these are cheap
+# to detect by identity and not all of them cache well in _KIND_CACHE
+# (e.g. every annotation string)
+_TYPE_DISPATCH: dict[type, Callable[..., Any]] = {
+    TypeVar: _convert_typevar,
+    UnionType: _convert_union,
+    ForwardRef: _convert_forwardref,
+    str: _convert_annotation,
+}
+
+def convert_from_json(cls: type[T], value: JsonTypeCo, typevars_: dict[TypeVar, type]|None = None, parent: type|None = None) -> T:
     """
     Convert a json value to a T instance.
 
@@ -38,85 +546,115 @@ def convert_from_json(cls: type[T], value: JsonTypeCo, typevars_: dict[str, type
     - TypeAliases
     - Generic TypeAliases and dataclasses
     """
+    if cls in _PRIMITIVES and isinstance(value, cls): # common leaf fast path
+        return value
+    if type(value) is cls: # already the target type, e.g. a datetime or
+        # enum member passed back in from a round-trip or union retry
+        return value # type: ignore
     typevars = (typevars_ or {})
-    if inspect.isabstract(cls):
+    handler = _TYPE_DISPATCH.get(type(cls))
+    if handler is not None:
+        return handler(cls, value, typevars, parent)
+    kind = _KIND_CACHE.get(cls)
+    if kind is None:
+        kind = _classify(cls)
+    if kind == _KIND_ABSTRACT:
         raise TypeError("Conversion type must be concrete")
     err = TypeError(F"Failed to convert {value} to {cls}")
-    if cls in (int, str, bool, float, NoneType) and isinstance(value, cls):
-        return value
-    elif hasattr(cls, 'from_json'): # overridden deserialization
-        return getattr(cls, 'from_json')(value)
-    elif hasattr(cls, '__origin__'): # generics
-        origin: type = getattr(cls, '__origin__')
-        if origin in (list, set):
-            t, = getattr(cls, '__args__')
+    if kind == _KIND_PRIMITIVE:
+        if isinstance(value, cls):
+            return value
+    elif kind == _KIND_FROM_JSON: # overridden deserialization
+        fn = _BOUND_FROM_JSON.get(cls)
+        if fn is None:
+            fn = getattr(cls, 'from_json')
+            _BOUND_FROM_JSON[cls] = fn
+        return fn(value)
+    elif kind == _KIND_GENERIC:
+        info = _GENERIC_INFO.get(cls)
+        if info is None:
+            info = (getattr(cls, '__origin__'), getattr(cls, '__args__'))
+            _GENERIC_INFO[cls] = info
+        origin, type_args = info
+        # bind the recursion target once: LOAD_FAST per element in the
+        # comprehensions below instead of LOAD_GLOBAL
+        _conv = convert_from_json
+        if origin is list:
+            t, = type_args
             if not isinstance(value, list):
                 raise err
-            return origin(convert_from_json(t, v, typevars, parent) for v in value)
+            if t in _PRIMITIVES:
+                # homogeneous primitive payload: no recursion per element
+                for v in value:
+                    if not isinstance(v, t):
+                        raise TypeError(F"No known conversion from {v} to {t}")
+                return value.copy() # type: ignore - validated list of T
+            return [_conv(t, v, typevars, parent) for v in value] # type: ignore - list args are T args
+        elif origin is set:
+            t, = type_args
+            if not isinstance(value, list):
+                raise err
+            return {_conv(t, v, typevars, parent) for v in value} # type: ignore - set args are T args
         elif origin is tuple:
-            ts = getattr(cls, '__args__')
             if not isinstance(value, list):
                 raise err
-            return tuple(convert_from_json(t, v, typevars, parent) for t, v in zip(ts, value)) # type: ignore - tuple args are T args
+            return tuple([_conv(t, v, typevars, parent) for t, v in zip(type_args, value)]) # type: ignore - tuple args are T args
         elif origin is dict:
-            _kt, vt = getattr(cls, '__args__')
+            _kt, vt = type_args
             if not isinstance(value, dict):
                 raise err
-            return origin({
-                k: convert_from_json(vt, v, typevars, parent)
+            return { # type: ignore - dict args are T args
+                k: _conv(vt, v, typevars, parent)
                 for k, v in value.items()
-            })
+            }
+        elif origin is Union: # typing.Union[A, B], same handling as A|B
+            return _convert_union(cls, value, typevars, parent) # type: ignore
         elif is_dataclass(origin):
             typeparams: list[TypeVar] = getattr(origin, '__parameters__')
-            args: list[type] = getattr(cls, '__args__')
             newtypevars = {
-                str(var): t # like ~T: int
-                for var, t in zip(typeparams, args)
+                var: t # like ~T: int, keyed by the TypeVar itself
+                for var, t in zip(typeparams, type_args)
             }
             return _dataclass_from_json(origin, value, typevars | newtypevars) # type: ignore - is_dataclass discards T
         else:
             raise err
-    elif type(cls) is TypeVar:
-        name = str(cls)
-        if name not in typevars:
-            raise ValueError(F"Unbound generic type variable {name} in {cls}")
-        return convert_from_json(typevars[name], value, typevars, cls) # type: ignore
-    elif type(cls) is UnionType:
-        args = getattr(cls, '__args__')
-        if type(value) in args:
-            return value # type: ignore - value is already of the correct type
-        for t in getattr(cls, '__args__'):
-            try:
-                return convert_from_json(t, value, typevars, parent)
-            except TypeError:
-                pass
-        raise err
-    elif is_dataclass(cls):
+    elif kind == _KIND_DATACLASS:
         return _dataclass_from_json(cls, value, typevars) # type: ignore - is_dataclass discards T
-    elif cls == datetime:
+    elif kind == _KIND_DATETIME:
         if isinstance(value, str):
-            return datetime.fromisoformat(value) # type: ignore
+            return _fromisoformat(value) # type: ignore
         elif isinstance(value, (int, float)):
             return datetime.fromtimestamp(value) # type: ignore
         else:
             raise err
-    elif inspect.isclass(cls) and issubclass(cls, Enum):
+    elif kind == _KIND_ENUM:
         if not isinstance(value, (str, int)):
             raise err
         return cls(value) # type: ignore
-    elif type(cls) is str: # delayed annotation
-        if parent is not None:
-            cls_globals = vars(sys.modules[parent.__module__])
-        else:
-            cls_globals = {}
-        t = eval(cls, cls_globals)
-        return convert_from_json(t, value, typevars, parent)
-    else:
-        raise TypeError(F"No known conversion from {value} to {cls}")
+    raise TypeError(F"No known conversion from {value} to {cls}")
 
 class DataclassJsonMixin:
     """Mixin for dataclasses to add a from_json method"""
+    __slots__ = ()
 
     @classmethod
     def from_json(cls: type[T], value: 'JsonTypeCo') -> T:
-        return _dataclass_from_json(cls, value, {})
+        fn = _FROM_JSON_CACHE.get(cls)
+        if fn is None:
+            fn = _build_from_json(cls)
+        return fn(value)
+
+    @classmethod
+    def from_json_bytes(cls: type[T], raw: bytes) -> T:
+        '''Decode directly from JSON bytes, without an intermediate dict
+        when msgspec is installed'''
+        decoder = _bytes_decoder(cls)
+        if decoder is not None:
+            try:
+                return decoder.decode(raw)
+            except msgspec.DecodeError: # type: ignore - implied not None
+                # e.g. date-only datetimes, which msgspec's strict RFC3339
+                # parsing rejects but _fromisoformat accepts
+                pass
+        import json
+        return cls.from_json(json.loads(raw)) # type: ignore - cls has the mixin
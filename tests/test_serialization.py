@@ -1,3 +1,4 @@
+import json
 from dataclasses import asdict, dataclass
 from enum import Enum
 from datetime import datetime
@@ -93,43 +94,67 @@ def test_de_datetime():
     assert x == ser.convert_from_json(datetime, x.isoformat())
     assert x == ser.convert_from_json(datetime, x.timestamp())
 
-def test_de_post():
+# real payload as served by a Mastodon instance
+POST_JSON: JsonType = {
+    'id': '109958407801025523', 'created_at': '2023-03-03T08:29:10.291Z',
+    'in_reply_to_id': None, 'in_reply_to_account_id': None,
+    'sensitive': False, 'spoiler_text': '', 'visibility': 'public',
+    'language': 'en',
+    'uri': \
+        'https://mastodon.skye.vg/users/dunkyl/statuses/109958407801025523',
+    'url': 'https://mastodon.skye.vg/@dunkyl/109958407801025523', 
+    'replies_count': 0, 'reblogs_count': 0, 'favourites_count': 0, 
+    'edited_at': None, 'favourited': False, 'reblogged': False,
+    'muted': False,'bookmarked': False, 'pinned': False, 'local_only': None, 'content': '<p>test 4</p>', 'filtered': [], 'reblog': None, 
+    'application': {
+        'name': 'SlyMastodon Test', 
+        'website': 'https://github.com/dunkyl/SlyMastodon'
+    },
+    'account': {
+        'id': '109289749579593700', 'username': 'dunkyl', 'acct': 'dunkyl',
+        'display_name': 'Dunkyl 🔣🔣', 'locked': False, 'bot': False,
+        'discoverable': True, 'group': False,
+        'created_at': '2022-11-05T00:00:00.000Z', 'note': '',
+        'url': 'https://mastodon.skye.vg/@dunkyl',
+        'avatar': \
+            'https://mastodon-cdn.skye.vg/accounts/avatars/109/289/749/579/593/700/original/1e2288841aab39a6.png',
+        'avatar_static': \
+            'https://mastodon-cdn.skye.vg/accounts/avatars/109/289/749/579/593/700/original/1e2288841aab39a6.png',
+        'header': \
+            'https://mastodon-cdn.skye.vg/accounts/headers/109/289/749/579/593/700/original/0b27b0466b0d259f.jpg',
+        'header_static': \
+            'https://mastodon-cdn.skye.vg/accounts/headers/109/289/749/579/593/700/original/0b27b0466b0d259f.jpg',
+        'followers_count': 5, 'following_count': 22, 'statuses_count': 31,
+        'last_status_at': '2023-03-03', 'noindex': False, 'emojis': [],
+        'roles': [], 'fields': []
+    }, 
+    'media_attachments': [], 'mentions': [], 'tags': [], 'emojis': [], 
+    'reactions': [], 'card': None, 'poll': None, 'quote': None
+}
+
 
-    x: JsonType = {
-        'id': '109958407801025523', 'created_at': '2023-03-03T08:29:10.291Z',
-        'in_reply_to_id': None, 'in_reply_to_account_id': None,
-        'sensitive': False, 'spoiler_text': '', 'visibility': 'public',
-        'language': 'en',
-        'uri': \
-            'https://mastodon.skye.vg/users/dunkyl/statuses/109958407801025523',
-        'url': 'https://mastodon.skye.vg/@dunkyl/109958407801025523', 
-        'replies_count': 0, 'reblogs_count': 0, 'favourites_count': 0, 
-        'edited_at': None, 'favourited': False, 'reblogged': False,
-        'muted': False,'bookmarked': False, 'pinned': False, 'local_only': None, 'content': '<p>test 4</p>', 'filtered': [], 'reblog': None, 
-        'application': {
-            'name': 'SlyMastodon Test', 
-            'website': 'https://github.com/dunkyl/SlyMastodon'
-        },
-        'account': {
-            'id': '109289749579593700', 'username': 'dunkyl', 'acct': 'dunkyl',
-            'display_name': 'Dunkyl 🔣🔣', 'locked': False, 'bot': False,
-            'discoverable': True, 'group': False,
-            'created_at': '2022-11-05T00:00:00.000Z', 'note': '',
-            'url': 'https://mastodon.skye.vg/@dunkyl',
-            'avatar': \
-                'https://mastodon-cdn.skye.vg/accounts/avatars/109/289/749/579/593/700/original/1e2288841aab39a6.png',
-            'avatar_static': \
-                'https://mastodon-cdn.skye.vg/accounts/avatars/109/289/749/579/593/700/original/1e2288841aab39a6.png',
-            'header': \
-                'https://mastodon-cdn.skye.vg/accounts/headers/109/289/749/579/593/700/original/0b27b0466b0d259f.jpg',
-            'header_static': \
-                'https://mastodon-cdn.skye.vg/accounts/headers/109/289/749/579/593/700/original/0b27b0466b0d259f.jpg',
-            'followers_count': 5, 'following_count': 22, 'statuses_count': 31,
-            'last_status_at': '2023-03-03', 'noindex': False, 'emojis': [],
-            'roles': [], 'fields': []
-        }, 
-        'media_attachments': [], 'mentions': [], 'tags': [], 'emojis': [], 
-        'reactions': [], 'card': None, 'poll': None, 'quote': None
-    }
-
-    ser.convert_from_json(Post|None, x)
\ No newline at end of file
+def test_de_post():
+    ser.convert_from_json(Post|None, POST_JSON)
+
+def test_de_post_bytes():
+    x = Post.from_json_bytes(json.dumps(POST_JSON).encode())
+    assert x.id == POST_JSON['id']
+    assert x.account.username == 'dunkyl'
+
+def test_post_plain_content():
+    assert Post.from_json(POST_JSON).plain_content == 'test 4'
+
+def test_de_media_attachment():
+    # meta's recursive JsonMap annotation can't resolve eagerly; make sure
+    # attachments still decode
+    x = dict(POST_JSON, media_attachments=[{
+        'id': '109958407578097523', 'type': 'image',
+        'url': 'https://mastodon-cdn.skye.vg/media_attachments/a.png',
+        'preview_url': \
+            'https://mastodon-cdn.skye.vg/media_attachments/a_small.png',
+        'remote_url': None, 'meta': {'focus': '0.0,0.0'},
+        'description': 'test image', 'blurhash': 'UBL_:rOpGG-;~qRjWBay'
+    }])
+    att, = Post.from_json(x).media_attachments
+    assert att.id == '109958407578097523'
+    assert att.meta == {'focus': '0.0,0.0'}